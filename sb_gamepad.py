@@ -8,6 +8,7 @@
 # - https://docs.python.org/3/glossary.html#term-iterable
 # - https://docs.micropython.org/en/latest/reference/speed_python.html
 #
+from array import array
 import gc
 from micropython import const
 from struct import unpack, unpack_from
@@ -49,6 +50,137 @@ TYPE_POWERA_WIRED  = const(6)  # 20d6:a711 PowerA Wired Controller (for Switch)
 TOO_MANY_GAMEPAD_TIMEOUTS = const(99)
 TOO_MANY_KEYBOARD_TIMEOUTS = const(9999)
 
+# Largest input packet that InputDevice reads (full speed max packet size)
+_MAX_PACKET = const(64)
+
+# Size of the optional report buffer for InputDevice.input_event_generator().
+# It holds two max size packets (current and previous report).
+REPORT_BUF_SIZE = const(2 * _MAX_PACKET)
+
+
+def _bitfield_table(bit_map):
+    # Build a lookup table to map a raw report byte to a button bitfield
+    # - bit_map: tuple of (report_bit_mask, button) pairs
+    # - returns: 256 entry array('H') of button bitfields, indexed by byte
+    #
+    table = array('H', [0] * 256)
+    for i in range(256):
+        v = 0
+        for (mask, button) in bit_map:
+            if i & mask:
+                v |= button
+        table[i] = v
+    return table
+
+
+def _axis_table(low, high):
+    # Build a lookup table to map a raw analog axis byte to a dpad bitfield
+    # - low: button for 0x00 (left or up)
+    # - high: button for 0xff (right or down)
+    # - returns: 256 entry array('H') of button bitfields, indexed by byte
+    #
+    table = array('H', [0] * 256)
+    table[0x00] = low
+    table[0xff] = high
+    return table
+
+
+def _keycode_table(key_map):
+    # Build a lookup table to map a keyboard keycode to a button bitfield
+    # - key_map: tuple of (keycode, button) pairs
+    # - returns: 256 entry array('H') of button bitfields, indexed by keycode
+    #
+    table = array('H', [0] * 256)
+    for (keycode, button) in key_map:
+        table[keycode] = button
+    return table
+
+
+# Report byte to button bitfield lookup tables. Table lookups let the
+# normalize_* generators convert each report byte with one subscript instead of
+# a string of bit tests. See input_event_generator() for the report formats.
+_SP_D2 = _bitfield_table(((0x01, Y), (0x02, X), (0x04, B), (0x08, A),
+    (0x40, R)))
+_SP_D3 = _bitfield_table(((0x01, SELECT), (0x02, START)))
+_SP_D4 = _bitfield_table(((0x01, DOWN), (0x02, UP), (0x04, RIGHT),
+    (0x08, LEFT), (0x40, L)))
+_ADA_D0 = _axis_table(LEFT, RIGHT)
+_ADA_D1 = _axis_table(UP, DOWN)
+_ADA_D5 = _bitfield_table(((0x10, X), (0x20, A), (0x40, B), (0x80, Y)))
+_ADA_D6 = _bitfield_table(((0x01, L), (0x02, R), (0x10, SELECT),
+    (0x20, START)))
+_ZERO2_D0 = _bitfield_table(((0x01, A), (0x02, B), (0x08, X), (0x10, Y),
+    (0x40, L), (0x80, R)))
+_ZERO2_D1 = _bitfield_table(((0x04, SELECT), (0x08, START)))
+_PA_D0 = _bitfield_table(((0x01, Y), (0x02, B), (0x04, A), (0x08, X),
+    (0x10, L), (0x20, R)))
+_PA_D1 = _bitfield_table(((0x01, SELECT), (0x02, START)))
+
+# 4-bit BCD dpad (hat switch) to button bitfield lookup table, shared by the
+# 8BitDo Zero 2 and PowerA Wired normalizers. Only 0x00 to 0x07 are directions.
+# Other values, including 0x0f for dpad center, map to no buttons. Dpad bits
+# fit in one byte, so this is a plain 256 byte table.
+_BCD_DPAD = bytes((
+    UP,            # 0x00 N
+    UP | RIGHT,    # 0x01 NE
+    RIGHT,         # 0x02 E
+    DOWN | RIGHT,  # 0x03 SE
+    DOWN,          # 0x04 S
+    DOWN | LEFT,   # 0x05 SW
+    LEFT,          # 0x06 W
+    UP | LEFT,     # 0x07 NW
+)) + bytes(248)
+
+# Boot keyboard keycode to button bitfield lookup table (US QWERTY layout)
+_KEYCODE_BUTTONS = _keycode_table((
+    (0x1a, UP), (0x52, UP),        # W, up-arrow
+    (0x16, DOWN), (0x51, DOWN),    # S, down-arrow
+    (0x04, LEFT), (0x50, LEFT),    # A, left-arrow
+    (0x07, RIGHT), (0x4f, RIGHT),  # D, right-arrow
+    (0x1d, A), (0x2c, A),          # Z, spacebar
+    (0x1b, B),                     # X
+    (0x06, X),                     # C
+    (0x19, Y),                     # V
+    (0x14, L),                     # Q
+    (0x08, R),                     # E
+    (0x28, START),                 # Enter
+    (0x29, SELECT),                # Esc
+))
+
+
+# Switch Pro handshake messages, with the player LED message for player 1 or 2
+_SP_HANDSHAKE_START = (
+    b'\x80\x01',  # get device type and mac address
+    b'\x80\x02',  # handshake
+    b'\x80\x03',  # set faster baud rate
+    b'\x80\x02',  # handshake
+    b'\x80\x04',  # use USB HID only and disable timeout
+    # set input report mode to standard
+    b'\x01\x06\x00\x00\x00\x00\x00\x00\x00\x00\x03\x30',
+)
+# set player LEDs to on (for LED1+LED2 do 30 03, etc.)
+_SP_LEDS_P1 = b'\x01\x0a\x00\x00\x00\x00\x00\x00\x00\x00\x30\x01'
+_SP_LEDS_P2 = b'\x01\x0a\x00\x00\x00\x00\x00\x00\x00\x00\x30\x03'
+# set home LED
+_SP_HOME_LED = (b'\x01\x0b\x00\x00\x00\x00\x00\x00\x00\x00\x38\x01'
+    b'\x00\x00\x11\x11')
+_SP_HANDSHAKE_P1 = _SP_HANDSHAKE_START + (_SP_LEDS_P1, _SP_HOME_LED)
+_SP_HANDSHAKE_P2 = _SP_HANDSHAKE_START + (_SP_LEDS_P2, _SP_HOME_LED)
+
+# XInput player number LED messages
+_XI_LEDS_P1 = b'\x01\x03\x02'  # 1 LED
+_XI_LEDS_P2 = b'\x01\x03\x03'  # 2 LEDs
+#_XI_LEDS_P3 = b'\x01\x03\x04'  # 3 LEDs
+#_XI_LEDS_P4 = b'\x01\x03\x05'  # 4 LEDs
+
+# An all-zeros 18 byte device descriptor (see find_usb_device())
+_ZERO_DESC = bytes(18)
+
+# Keys of devices that find_usb_device() already checked and found to be
+# unsupported, as (idVendor, idProduct, port_numbers) tuples. Keys get dropped
+# when a scan of their port no longer finds the device.
+_unsupported = set()
+
 
 def find_usb_device(player=None):
     # Find a USB wired gamepad by inspecting usb device descriptors
@@ -57,6 +189,7 @@ def find_usb_device(player=None):
     # - return: ScanResult object for success or None for failure.
     # Exceptions: may raise USBError, USBTimeoutError, ValueError
     #
+    seen = set()  # keys of devices found on this player's port
     for device in core.find(find_all=True):
         # Player number filter
         pn = device.port_numbers
@@ -68,6 +201,12 @@ def find_usb_device(player=None):
             # Board doesn't have a USB hub, or it has a hub but the device is
             # not plugged into port 2. Won't work for Player 2, so skip it.
             continue
+        # Skip devices that an earlier scan already found to be unsupported.
+        # Checking vid:pid from usb.core.Device doesn't need a descriptor read.
+        key = (device.idVendor, device.idProduct, pn)
+        seen.add(key)
+        if key in _unsupported:
+            continue
         # Read descriptor to identify device by vid:pid or class:subclass
         desc = sb_usb_descriptor.Descriptor(device)
         # Check for an all zeros descriptor. As of CircuitPython 10.0.0-beta.2,
@@ -75,7 +214,7 @@ def find_usb_device(player=None):
         # always generate a device with an invalid descriptor. If that happens,
         # bail out.
         desc_bytes = desc.to_bytes()
-        if all((byte_ == 0 for byte_ in desc_bytes)):
+        if desc_bytes == _ZERO_DESC:
             raise ValueError("usb.core.find() returned all-zeros descriptor")
         # Compare descriptor to known device type fingerprints
         desc.read_configuration(device)
@@ -104,8 +243,22 @@ def find_usb_device(player=None):
         elif d_i0 == (0x00, 0x00, 0x03, 0x01):
             return InputDevice(dev, TYPE_BOOT_KEYBOARD, 'BootKeyboard', desc)
         else:
-            # Ignore unknown devices
+            # Ignore unknown devices, and remember them for the next scan.
+            # But if interface 0 is missing, the configuration descriptor read
+            # may have glitched, so leave the device to be checked again.
+            if i0 != (None, None):
+                _unsupported.add(key)
             continue
+    # Forget unsupported devices that were unplugged from this player's port,
+    # so they get a fresh look if they are plugged back in. Keys for the other
+    # player's port are left for that player's scan to check.
+    for key in tuple(_unsupported):
+        if key in seen:
+            continue
+        pn = key[2]
+        if ((player is None) or (player == 1 and pn in (None, (1,)))
+                or (player == 2 and pn == (2,))):
+            _unsupported.discard(key)
     return None
 
 
@@ -115,7 +268,7 @@ def elapsed_ms_generator():
     # - iterator yields: ms since last call to next(iterator)
     #
     ms = ticks_ms      # caching function ref avoids dictionary lookups
-    mask = 0x3fffffff  # (2**29)-1 because ticks_ms rolls over at 2**29
+    mask = 0x1fffffff  # (2**29)-1 because ticks_ms rolls over at 2**29
     t0 = ms()
     while True:
         t1 = ms()
@@ -124,6 +277,166 @@ def elapsed_ms_generator():
         yield delta
 
 
+def _normalize_switchpro(data):
+    # Generator function converts Switch Pro reports to XInput format uint16
+    # - data: an iterator that yields memoryview(bytearray(...)) or None
+    #
+    # Report format (cluster layout: A on right)
+    # byte 0: report ID
+    # byte 1: sequence number
+    # byte 2: 0x01=Y, 0x02=X, 0x04=B, 0x08=A, 0x40=R, 0x80=R2
+    # byte 3: 0x01=Select, 0x02=Start, 0x04=R_stick_btn,
+    #         0x08=L_stick_btn, 0x10=Home=0x10, 0x20=Share
+    # byte 4: DpadDn=0x01, DpadUp=0x02, DpadR=0x04, DpadL=0x08,
+    #         0x40=L, 0x80=L2
+    #
+    t2 = _SP_D2  # caching globals avoids dictionary lookups
+    t3 = _SP_D3
+    t4 = _SP_D4
+    for d in data:
+        if d is None:
+            yield None
+            continue
+        # d[0], d[1], d[2] are bytes 2, 3, 4 of unfiltered report
+        yield t2[d[0]] | t3[d[1]] | t4[d[2]]
+
+
+def _normalize_adasnes(data):
+    # Generator function converts Adafruit SNES reports to XInput format uint16
+    # - data: an iterator that yields memoryview(bytearray(...)) or None
+    #
+    # Report format (SNES cluster layout, A on right)
+    # byte 0: (analog dpad) 0x00=dPadL, 0x7f=dPadCenter, 0xff=dPadR
+    # byte 1: (analog dpad) 0x00=dPadUp, 0x7f=dPadCenter, 0xff=dPadDn
+    # ...
+    # byte 5: (bitfield) 0x10=X, 0x20=A, 0x40=B, 0x80=Y
+    # byte 6: (bitfield) 0x01=L, 0x02=R, 0x10=Select, 0x20=Start
+    #
+    t0 = _ADA_D0  # caching globals avoids dictionary lookups
+    t1 = _ADA_D1
+    t5 = _ADA_D5
+    t6 = _ADA_D6
+    for d in data:
+        if d is None:
+            yield None
+            continue
+        # Dpad uses 2 analog axes, buttons are bitfield
+        yield t0[d[0]] | t1[d[1]] | t5[d[5]] | t6[d[6]]
+
+
+def _normalize_zero2(data):
+    # Generator function converts 8BitDo Zero 2 reports to XInput format uint16
+    # - data: an iterator that yields memoryview(bytearray(...)) or None
+    #
+    # This device is quirky because it alternates between 8 byte and 24 byte
+    # HID reports. The 24 byte reports seem to be three of the 8 byte reports
+    # stuck together.
+    #
+    # Report format (dpad is 4-bit BCD style):
+    # byte 0: 0x01=A, 0x02=B, 0x08=X, 0x10=Y, 0x40=L, 0x80=R
+    # byte 1: 0x04=Select, 0x08=Start
+    # byte 2: 0x00=dPadN, 0x01=dPadNE, 0x02=dPadE, 0x03=dPadSE,
+    #         0x04=dPadS, 0x05=dPadSW, 0x06=dPadW, 0x07=dPadNW,
+    #         0x0f=dPadCenter
+    #
+    t0 = _ZERO2_D0  # caching globals avoids dictionary lookups
+    t1 = _ZERO2_D1
+    dpad = _BCD_DPAD
+    for d in data:
+        if d is None:
+            yield None
+            continue
+        # Buttons are bitfield, dpad is 4-bit BCD
+        yield t0[d[0]] | t1[d[1]] | dpad[d[2]]
+
+
+def _normalize_powera_wired(data):
+    # Generator function converts PowerA Wired reports to XInput format uint16
+    # - data: an iterator that yields memoryview(bytearray(...)) or None
+    #
+    # This device is a straightforward well-behaved HID gamepad with 4-bit
+    # BCD dpad and 8-bits per axis analog (which I'm ignoring).
+    #
+    # Report format (dpad is 4-bit BCD style, buttons are bitfield):
+    # byte 0: 0x01=Y, 0x02=B, 0x04=A, 0x08=X, 0x10=L, 0x20=R,
+    #         0x40=L1, 0x80=R2
+    # byte 1: 0x01=Select, 0x02=Start, 0x10=Home, 0x20=Screenshot
+    # byte 2: 0x00=dPadN, 0x01=dPadNE, 0x02=dPadE, 0x03=dPadSE,
+    #         0x04=dPadS, 0x05=dPadSW, 0x06=dPadW, 0x07=dPadNW,
+    #         0x0f=dPadCenter
+    #
+    t0 = _PA_D0  # caching globals avoids dictionary lookups
+    t1 = _PA_D1
+    dpad = _BCD_DPAD
+    for d in data:
+        if d is None:
+            yield None
+            continue
+        # Buttons are bitfield, dpad is 4-bit BCD
+        yield t0[d[0]] | t1[d[1]] | dpad[d[2]]
+
+
+def _normalize_xinput(data):
+    # Generator function converts XInput report bytes 2 and 3 to a uint16
+    # - data: an iterator that yields memoryview(bytearray(...)) or None
+    #
+    # Report format (clone w/ SNES cluster layout, A on right):
+    # (NOTE: This is the canonical format that others get normalized to)
+    #  ...
+    #  byte 2: 0x01=dPadUp, 0x02=dPadDn, 0x04=dPadL, 0x08=dPadR,
+    #          0x10=Start, 0x20=Select
+    #  byte 3: 0x01=L, 0x02=R, 0x10=B, 0x20=A, 0x05=Home, 0x40=Y, 0x80=X
+    #
+    for d in data:
+        yield None if d is None else ((d[1] << 8) | d[0])
+
+
+def _normalize_boot_keyboard(data):
+    # Generator function converts boot keyboard reports to XInput format uint16
+    # - data: an iterator that yields memoryview(bytearray(...)) or None
+    #
+    # Keyboard to gamepad mapping using US QWERTY layout boot keyboard:
+    #  WASD   =>  d-pad up, left, down, right
+    #  arrows =>  alternate d-pad up, left, down, right
+    #  ZXCV   =>  ABXY cluster buttons (SNES style, A on the right)
+    #  Space  =>  alternate A
+    #  QE     =>  L and R shoulder buttons
+    #  Enter  =>  Start
+    #  Esc    =>  Select
+    #
+    kb = _KEYCODE_BUTTONS  # caching globals avoids dictionary lookups
+    for d in data:
+        if d is None:
+            yield None
+            continue
+        # This is a keyscan code decoder that totally ignores all the modifier
+        # keys. Bytes 2 to 7 hold up to 6 keycodes.
+        v = kb[d[2]] | kb[d[3]] | kb[d[4]] | kb[d[5]] | kb[d[6]] | kb[d[7]]
+        # For d-pad conflicts, up and left take priority over down and right.
+        if v & UP:
+            v &= ~DOWN
+        if v & LEFT:
+            v &= ~RIGHT
+        yield v
+
+
+# Report normalizers and int0_read_generator() arguments, indexed by dev_type.
+# Entries are (normalizer, slice_lo, slice_hi, report_id).
+_NORMALIZERS = (
+    None,                                       # (no dev_type 0)
+    # Skip reports when report ID is not 0x30. For report ID 0x30, trim off
+    # report ID, sequence number, and IMU data, leaving bytes for buttons,
+    # dpad, and sticks.
+    (_normalize_switchpro,     3, 6,    0x30),  # TYPE_SWITCH_PRO
+    (_normalize_adasnes,       0, 7,    None),  # TYPE_ADAFRUIT_SNES
+    (_normalize_zero2,         0, 3,    None),  # TYPE_8BITDO_ZERO2
+    # Slice trims off all the XInput analog stuff
+    (_normalize_xinput,        2, 4,    None),  # TYPE_XINPUT
+    (_normalize_boot_keyboard, 0, None, None),  # TYPE_BOOT_KEYBOARD
+    (_normalize_powera_wired,  0, 3,    None),  # TYPE_POWERA_WIRED
+)
+
+
 class InputDevice:
     def __init__(self, device, dev_type, tag, descriptor):
         # Initialize buffers used in polling USB gamepad events
@@ -131,7 +444,6 @@ class InputDevice:
         # Exceptions: may raise usb.core.USBError
         #
         self._prev = 0
-        self.buf64 = bytearray(64)
         self.device = device
         self.dev_type = dev_type
         self.tag = tag
@@ -153,6 +465,17 @@ class InputDevice:
         endpoint_out = None if (len(int0_outs) < 1) else int0_outs[0]
         self.int0_endpoint_in = endpoint_in
         self.int0_endpoint_out = endpoint_out
+        if endpoint_in is None:
+            raise ValueError("No input endpoint on interface 0")
+        # Cache input endpoint values and read function so the polling code
+        # doesn't have to walk attribute chains every time
+        self._in_addr = endpoint_in.bEndpointAddress
+        self._in_interval = endpoint_in.bInterval
+        self._in_maxpkt = min(_MAX_PACKET, endpoint_in.wMaxPacketSize)
+        self._dev_read = device.read
+        # Buffer for reading ACKs and junk reports during device init. The
+        # init helpers share it rather than each allocating their own.
+        self._init_buf = bytearray(self._in_maxpkt)
         # Initialize USB device if needed (e.g. handshake or set gamepad LEDs)
         if dev_type == TYPE_SWITCH_PRO:
             self.init_switch_pro_gamepad(self.player)
@@ -168,51 +491,31 @@ class InputDevice:
             pass
         else:
             raise ValueError('Unknown dev_type: %d' % dev_type)
+        # Collect garbage from descriptor parsing and init now, rather than
+        # letting an automatic collection land in the middle of polling
+        gc.collect()
 
     def init_switch_pro_gamepad(self, player=1):
         # Prepare Switch Pro compatible gamepad for use.
         # Exceptions: may raise usb.core.USBError and usb.core.USBTimeoutError
         #
         out_addr = self.int0_endpoint_out.bEndpointAddress
-        in_addr = self.int0_endpoint_in.bEndpointAddress
+        in_addr = self._in_addr
         out_interval = self.int0_endpoint_out.bInterval
-        in_interval = self.int0_endpoint_in.bInterval
-        max_packet = min(64, self.int0_endpoint_in.wMaxPacketSize)
-        data = bytearray(max_packet)
-        data_mv = memoryview(data)
-        # Pick LED byte, default is 1 LED lit for player 1
-        leds = bytes(b'\x01\x0a\x00\x00\x00\x00\x00\x00\x00\x00\x30\x01')
-        if player == 2:
-            leds = bytes(b'\x01\x0a\x00\x00\x00\x00\x00\x00\x00\x00\x30\x03')
-        # Build handshake bytes
-        handshake_messages = (
-            bytes(b'\x80\x01'),  # get device type and mac address
-            bytes(b'\x80\x02'),  # handshake
-            bytes(b'\x80\x03'),  # set faster baud rate
-            bytes(b'\x80\x02'),  # handshake
-            bytes(b'\x80\x04'),  # use USB HID only and disable timeout
-            # set input report mode to standard
-            bytes(b'\x01\x06\x00\x00\x00\x00\x00\x00\x00\x00\x03\x30'),
-            # set player LEDs to on (for LED1+LED2 do 30 03, etc.)
-            leds,
-            # set home LED
-            bytes(b'\x01\x0b\x00\x00\x00\x00\x00\x00\x00\x00\x38\x01\x00\x00\x11\x11'),
-        )
-        for msg in handshake_messages:
+        in_interval = self._in_interval
+        data = self._init_buf
+        # Pick handshake messages with player LEDs, default is 1 LED lit for
+        # player 1
+        handshake = _SP_HANDSHAKE_P2 if (player == 2) else _SP_HANDSHAKE_P1
+        for msg in handshake:
             try:
                 self.device.write(out_addr, msg, timeout=out_interval)
             except USBTimeoutError as e:
                 raise ValueError("SwitchPro HANDSHAKE GLITCH (wr)")
-            # Wait for ACK
-            okay = False
-            for _ in range(8):
-                try:
-                    self.device.read(in_addr, data, timeout=in_interval)
-                    okay = True
-                    break
-                except USBTimeoutError:
-                    pass
-            if not okay:
+            # Wait for ACK with one read that allows up to 8 polling intervals
+            try:
+                self._dev_read(in_addr, data, timeout=in_interval * 8)
+            except USBTimeoutError:
                 # This happens with my 8BitDo Ultimate Bluetooth Controller's
                 # 2.4 GHz USB adapter. It glitches several times like this
                 # before re-appearing in XInput mode with vid:pid 045e:028e.
@@ -222,263 +525,53 @@ class InputDevice:
         # Prepare XInput gamepad for use.
         # Exceptions: may raise USBError
         out_addr = self.int0_endpoint_out.bEndpointAddress
-        in_addr = self.int0_endpoint_in.bEndpointAddress
+        in_addr = self._in_addr
         out_inteval = self.int0_endpoint_out.bInterval
-        in_interval = self.int0_endpoint_in.bInterval
-        max_packet = min(64, self.int0_endpoint_in.wMaxPacketSize)
-        data = bytearray(max_packet)
-        # Set player number LEDs on XInput gamepad (hardcode to player 1)
-        msg = bytes(b'\x01\x03\x02')  # 1 LED
-        if player == 2:
-            msg = bytes(b'\x01\x03\x03')  # 2 LEDs
-        #msg = bytes(b'\x01\x03\x04')  # 3 LEDs
-        #msg = bytes(b'\x01\x03\x05')  # 4 LEDs
+        in_interval = self._in_interval
+        data = self._init_buf
+        # Set player number LEDs on XInput gamepad
+        msg = _XI_LEDS_P2 if player == 2 else _XI_LEDS_P1
         self.device.write(out_addr, msg, timeout=8)
         # Some XInput gamepads send a bunch of stuff initially before normal
         # reports begin, so drain the input pipe
         for _ in range(8):
             try:
-                self.device.read(in_addr, data, timeout=in_interval)
+                self._dev_read(in_addr, data, timeout=in_interval)
             except USBTimeoutError as e:
                 # Ignore timeouts
                 pass
 
-    def input_event_generator(self):
+    def input_event_generator(self, buf=None):
         # This is a generator that makes an iterable for reading input events.
+        # - buf: Optional bytearray of at least REPORT_BUF_SIZE bytes to use
+        #   for report buffers. Passing the same buffer for each new device
+        #   avoids heap allocations when gamepads get plugged and unplugged.
         # - returns: iterable that can be used with a for loop
         # - yields: (2 possibilities)
         #   1. Normalized 16-bit integer with XInput style button bitfield
         #   2. None in the case of a timeout or rate limit throttle
         # Exceptions: may raise USBError, USBTimeoutError
         #
-        dev_type = self.dev_type  # cache this as we use it several times
-        int0_gen = self.int0_read_generator  # cache to make shorter lines
         if self.device is None:
             return None
-        elif dev_type == TYPE_SWITCH_PRO:
-            # Report format (cluster layout: A on right)
-            # byte 0: report ID
-            # byte 1: sequence number
-            # byte 2: 0x01=Y, 0x02=X, 0x04=B, 0x08=A, 0x40=R, 0x80=R2
-            # byte 3: 0x01=Select, 0x02=Start, 0x04=R_stick_btn,
-            #         0x08=L_stick_btn, 0x10=Home=0x10, 0x20=Share
-            # byte 4: DpadDn=0x01, DpadUp=0x02, DpadR=0x04, DpadL=0x08,
-            #         0x40=L, 0x80=L2
-            #
-            # Generator function converts byte array to an XInput format uint16
-            # - data: an iterator that yields memoryview(bytearray(...))
-            def normalize_switchpro(data):
-                for d in data:
-                    if d is None:
-                        yield None
-                        continue
-                    v = 0
-                    d2 = d[0]  # byte 2 of the unfiltered report
-                    d3 = d[1]  # byte 3 of the unfiltered report
-                    d4 = d[2]  # byte 4 of the unfiltered report
-                    v |= Y      if d2 & 0x01 else 0
-                    v |= X      if d2 & 0x02 else 0
-                    v |= B      if d2 & 0x04 else 0
-                    v |= A      if d2 & 0x08 else 0
-                    v |= R      if d2 & 0x40 else 0
-                    v |= SELECT if d3 & 0x01 else 0
-                    v |= START  if d3 & 0x02 else 0
-                    v |= DOWN   if d4 & 0x01 else 0
-                    v |= UP     if d4 & 0x02 else 0
-                    v |= RIGHT  if d4 & 0x04 else 0
-                    v |= LEFT   if d4 & 0x08 else 0
-                    v |= L      if d4 & 0x40 else 0
-                    yield v
-            # This filter lambda returns None when report ID is not 0x30. For
-            # report ID 0x30, filter trims off report ID, sequence number, and
-            # IMU data, leaving bytes for buttons, dpad, and sticks.
-            filter_fn = lambda d: None if (d[0] != 0x30) else d[3:6]
-            return normalize_switchpro(int0_gen(filter_fn=filter_fn))
-        elif dev_type == TYPE_ADAFRUIT_SNES:
-            # Report format (SNES cluster layout, A on right)
-            # byte 0: (analog dpad) 0x00=dPadL, 0x7f=dPadCenter, 0xff=dPadR
-            # byte 1: (analog dpad) 0x00=dPadUp, 0x7f=dPadCenter, 0xff=dPadDn
-            # ...
-            # byte 5: (bitfield) 0x10=X, 0x20=A, 0x40=B, 0x80=Y
-            # byte 6: (bitfield) 0x01=L, 0x02=R, 0x10=Select, 0x20=Start
-            #
-            def normalize_adasnes(data):
-                for d in data:
-                    if d is None:
-                        yield None
-                        continue
-                    v = 0
-                    d0 = d[0]  # byte 0 of the unfiltered report
-                    d1 = d[1]  # byte 1 of the unfiltered report
-                    d5 = d[5]  # byte 5 of the unfiltered report
-                    d6 = d[6]  # byte 6 of the unfiltered report
-                    # Dpad uses 2 analog axes
-                    v |= LEFT   if d0 == 0x00 else 0
-                    v |= RIGHT  if d0 == 0xff else 0
-                    v |= UP     if d1 == 0x00 else 0
-                    v |= DOWN   if d1 == 0xff else 0
-                    # Buttons are bitfield
-                    v |= X      if d5 & 0x10 else 0
-                    v |= A      if d5 & 0x20 else 0
-                    v |= B      if d5 & 0x40 else 0
-                    v |= Y      if d5 & 0x80 else 0
-                    v |= L      if d6 & 0x01 else 0
-                    v |= R      if d6 & 0x02 else 0
-                    v |= SELECT if d6 & 0x10 else 0
-                    v |= START  if d6 & 0x20 else 0
-                    yield v
-            return normalize_adasnes(int0_gen(filter_fn=lambda d: d[:7]))
-        elif dev_type == TYPE_8BITDO_ZERO2:
-            # This device is quirky because it alternates between 8 byte and
-            # 24 byte HID reports. The 24 byte reports seem to be three of the
-            # 8 byte reports stuck together.
-            #
-            # Report format (dpad is 4-bit BCD style):
-            # byte 0: 0x01=A, 0x02=B, 0x08=X, 0x10=Y, 0x40=L, 0x80=R
-            # byte 1: 0x04=Select, 0x08=Start
-            # byte 2: 0x00=dPadN, 0x01=dPadNE, 0x02=dPadE, 0x03=dPadSE,
-            #         0x04=dPadS, 0x05=dPadSW, 0x06=dPadW, 0x07=dPadNW,
-            #         0x0f=dPadCenter
-            #
-            def normalize_zero2(data):
-                for d in data:
-                    if d is None:
-                        yield None
-                        continue
-                    v = 0
-                    d0 = d[0]  # byte 0 of the unfiltered report
-                    d1 = d[1]  # byte 1 of the unfiltered report
-                    d2 = d[2]  # byte 2 of the unfiltered report
-                    # Buttons are bitfield
-                    v |= A            if d0 & 0x01 else 0
-                    v |= B            if d0 & 0x02 else 0
-                    v |= X            if d0 & 0x08 else 0
-                    v |= Y            if d0 & 0x10 else 0
-                    v |= L            if d0 & 0x40 else 0
-                    v |= R            if d0 & 0x80 else 0
-                    v |= SELECT       if d1 & 0x04 else 0
-                    v |= START        if d1 & 0x08 else 0
-                    # Dpad is 4-bit BCD
-                    v |= UP           if d2 == 0x00 else 0
-                    v |= UP | RIGHT   if d2 == 0x01 else 0
-                    v |= RIGHT        if d2 == 0x02 else 0
-                    v |= DOWN | RIGHT if d2 == 0x03 else 0
-                    v |= DOWN         if d2 == 0x04 else 0
-                    v |= DOWN | LEFT  if d2 == 0x05 else 0
-                    v |= LEFT         if d2 == 0x06 else 0
-                    v |= UP | LEFT    if d2 == 0x07 else 0
-                    yield v
-            return normalize_zero2(int0_gen(filter_fn=lambda d: d[:3]))
-        elif dev_type == TYPE_POWERA_WIRED:
-            # This device is a straightforward well-behaved HID gamepad with
-            # 4-bit BCD dpad and 8-bits per axis analog (which I'm ignoring).
-            #
-            # Report format (dpad is 4-bit BCD style, buttons are bitfield):
-            # byte 0: 0x01=Y, 0x02=B, 0x04=A, 0x08=X, 0x10=L, 0x20=R,
-            #         0x40=L1, 0x80=R2
-            # byte 1: 0x01=Select, 0x02=Start, 0x10=Home, 0x20=Screenshot
-            # byte 2: 0x00=dPadN, 0x01=dPadNE, 0x02=dPadE, 0x03=dPadSE,
-            #         0x04=dPadS, 0x05=dPadSW, 0x06=dPadW, 0x07=dPadNW,
-            #         0x0f=dPadCenter
-            #
-            def normalize_powera_wired(data):
-                for d in data:
-                    if d is None:
-                        yield None
-                        continue
-                    v = 0
-                    d0 = d[0]  # byte 0 of the unfiltered report
-                    d1 = d[1]  # byte 1 of the unfiltered report
-                    d2 = d[2]  # byte 2 of the unfiltered report
-                    # Buttons are bitfield
-                    v |= Y            if d0 & 0x01 else 0
-                    v |= B            if d0 & 0x02 else 0
-                    v |= A            if d0 & 0x04 else 0
-                    v |= X            if d0 & 0x08 else 0
-                    v |= L            if d0 & 0x10 else 0
-                    v |= R            if d0 & 0x20 else 0
-                    v |= SELECT       if d1 & 0x01 else 0
-                    v |= START        if d1 & 0x02 else 0
-                    # Dpad is 4-bit BCD
-                    v |= UP           if d2 == 0x00 else 0
-                    v |= UP | RIGHT   if d2 == 0x01 else 0
-                    v |= RIGHT        if d2 == 0x02 else 0
-                    v |= DOWN | RIGHT if d2 == 0x03 else 0
-                    v |= DOWN         if d2 == 0x04 else 0
-                    v |= DOWN | LEFT  if d2 == 0x05 else 0
-                    v |= LEFT         if d2 == 0x06 else 0
-                    v |= UP | LEFT    if d2 == 0x07 else 0
-                    yield v
-            return normalize_powera_wired(int0_gen(filter_fn=lambda d: d[:3]))
-        elif dev_type == TYPE_XINPUT:
-            # Report format (clone w/ SNES cluster layout, A on right):
-            # (NOTE: This is the canonical format that others get normalized to)
-            #  ...
-            #  byte 2: 0x01=dPadUp, 0x02=dPadDn, 0x04=dPadL, 0x08=dPadR,
-            #          0x10=Start, 0x20=Select
-            #  byte 3: 0x01=L, 0x02=R, 0x10=B, 0x20=A, 0x05=Home, 0x40=Y, 0x80=X
-            #
-            def normalize_xinput(data):
-                for d in data:
-                    yield None if d is None else ((d[1] << 8) | d[0])
-            # Filter lambda trims off all the analog stuff
-            return normalize_xinput(int0_gen(filter_fn=lambda d: d[2:4]))
-        elif dev_type == TYPE_BOOT_KEYBOARD:
-            # Keyboard to gamepad mapping using US QWERTY layout boot keyboard:
-            #  WASD   =>  d-pad up, left, down, right
-            #  arrows =>  alternate d-pad up, left, down, right
-            #  ZXCV   =>  ABXY cluster buttons (SNES style, A on the right)
-            #  Space  =>  alternate A
-            #  QE     =>  L and R shoulder buttons
-            #  Enter  =>  Start
-            #  Esc    =>  Select
-            def normalize_boot_keyboard(data):
-                for d in data:
-                    if d is None:
-                        yield None
-                        continue
-                    v = 0
-                    # This is a keyscan code decoder that totally ignores all
-                    # the modifier keys. For d-pad conflicts, up and left take
-                    # priority over down and right.
-                    codes = (d[2], d[3], d[4], d[5], d[6], d[7])
-                    if 0x1a in codes or 0x52 in codes:    # W, up-arrow
-                        v |= UP
-                    elif 0x16 in codes or 0x51 in codes:  # S, down-arrow
-                        v |= DOWN
-
-                    if 0x04 in codes or 0x50 in codes:    # A, left-arrow
-                        v |= LEFT
-                    elif 0x07 in codes or 0x4f in codes:  # D, right-arrow
-                        v |= RIGHT
-
-                    if 0x1d in codes or 0x2c in codes:  # Z, spacebar
-                        v |= A
-                    if 0x1b in codes:  # X
-                        v |= B
-                    if 0x06 in codes:  # C
-                        v |= X
-                    if 0x19 in codes:  # V
-                        v |= Y
-                    if 0x14 in codes:  # Q
-                        v |= L
-                    if 0x08 in codes:  # E
-                        v |= R
-                    if 0x28 in codes:  # Enter
-                        v |= START
-                    if 0x29 in codes:  # Esc
-                        v |= SELECT
-                    yield v
-            return normalize_boot_keyboard(int0_gen())
-        else:
-            # Ignore any other devices
-            return
+        # Look up the normalizer and report slicing for this device type
+        (normalize, lo, hi, report_id) = _NORMALIZERS[self.dev_type]
+        reports = self.int0_read_generator(slice_lo=lo, slice_hi=hi,
+            report_id=report_id, buf=buf)
+        return normalize(reports)
 
-    def int0_read_generator(self, filter_fn=lambda d: d):
+    def int0_read_generator(self, slice_lo=0, slice_hi=None, report_id=None,
+        buf=None):
         # Generator function: read from interface 0 and yield raw report data
-        # - filter_fn: Optional lambda function to modify raw reports. This is
-        #   for slicing off sequence numbers, analog values, or junk bytes.
-        # - yields: memoryview of bytes
+        # - slice_lo, slice_hi: Optional slice bounds to trim raw reports. This
+        #   is for slicing off sequence numbers, analog values, or junk bytes.
+        #   None for slice_hi means keep everything after slice_lo.
+        # - report_id: Optional report ID. If set, reports whose first byte
+        #   doesn't match get skipped (e.g. HID report with boring report ID).
+        # - buf: Optional bytearray of at least REPORT_BUF_SIZE bytes to use
+        #   for the read and previous report buffers. If None, a new one gets
+        #   allocated.
+        # - yields: memoryview of bytes (only valid until the next iteration)
         # Exceptions: may raise USBError, USBTimeoutError
         #
         # Meaning of bInterval depends on negotiated speed:
@@ -488,31 +581,42 @@ class InputDevice:
         # - Full-speed: max time = bInterval * 1 ms
         # - High-speed: max time = math.pow(2, bInterval-1) * 125 µs
         #
-        # This implementation alternates between two data buffers so it's
-        # possible to compare the previous report with the current report
-        # without having to heap allocate a new buffer every time.
+        # This implementation reads into one buffer and keeps a copy of the
+        # most recent distinct report in a second buffer, so it's possible to
+        # compare the previous report with the current report without having
+        # to heap allocate a new buffer every time.
         #
-        in_addr = self.int0_endpoint_in.bEndpointAddress
-        interval = self.int0_endpoint_in.bInterval
+        in_addr = self._in_addr
+        interval = self._in_interval
         if self.device.speed == SPEED_HIGH:
             # Units here are 125 µs or (1 ms)/8. Since timer resolution we have
             # available is 1 ms, quantize the requested interval to 1 ms units
             # (left shift 3 to divide by 8).
             interval = (2 << (interval - 1)) >> 3
-        max_packet = min(64, self.int0_endpoint_in.wMaxPacketSize)
-        odd = True
-        data_odd  = bytearray(max_packet)
-        data_even = bytearray(max_packet)
-        mv_odd    = memoryview(data_odd)  # memoryview reduces heap allocations
-        mv_even   = memoryview(data_even)
-        prev_report = mv_even
-        dev_read = self.device.read  # cache function to avoid dictionary lookups
+        max_packet = self._in_maxpkt
+        if slice_hi is None:
+            slice_hi = max_packet
+        check_id = report_id is not None
+        if buf is None:
+            buf = bytearray(REPORT_BUF_SIZE)
+        elif len(buf) < REPORT_BUF_SIZE:
+            raise ValueError("Report buffer too small: %d" % len(buf))
+        mv = memoryview(buf)  # memoryview reduces heap allocations
+        data = mv[:max_packet]   # read buffer
+        prev_data = mv[_MAX_PACKET:REPORT_BUF_SIZE]  # previous distinct report
+        prev_report = None
+        report = None            # trimmed view into read buffer
+        report_hi = -1           # slice_hi that report was sliced with
+        dev_read = self._dev_read
 
         # Make timer to throttle the polling rate because...
         # 1. Reading USB too much bogs down the system and fights with DVI
         # 2. Waiting too long to read USB will upset some devices
+        # (this inlines elapsed_ms_generator() to avoid a generator resume)
         poll_ms = 0
-        poll_dt = elapsed_ms_generator()
+        ms = ticks_ms      # caching function ref avoids dictionary lookups
+        mask = 0x1fffffff  # same rollover mask as elapsed_ms_generator()
+        t0 = ms()
         poll_target = (interval * 3) >> 2  # 75% of the max polling interval
 
         # Counter and max consecutive timeouts limit for guessing when the USB
@@ -524,7 +628,9 @@ class InputDevice:
 
         # Polling loop
         while True:
-            poll_ms += next(poll_dt)
+            t1 = ms()
+            poll_ms += (t1 - t0) & mask  # handle possible timer rollover
+            t0 = t1
             if poll_ms < poll_target:
                 yield None  # It's too soon to poll now
                 continue
@@ -532,38 +638,31 @@ class InputDevice:
                 poll_ms = 0
 
             # Enough time has passed, so poll endpoint and compare report data
-            # to that of the previous report. If they differ, update the
-            # previous value, swap the active buffer, and yield a memoryview
-            # into the most recent trimmed report data. The even/odd buffer
-            # swapping is necessary for the memoryview stuff to work properly.
+            # to that of the previous report. If they differ, copy the report
+            # to the previous report buffer and yield a memoryview into the
+            # most recent trimmed report data.
             #
-            # NOTE: This is using a lambda function provided by the caller to
-            # filter the raw data read from the endpoint. The lambda function
-            # can return None when the current read should be skipped (e.g. HID
-            # report with boring report ID).
+            # NOTE: This uses the caller's slice bounds to trim the raw data
+            # read from the endpoint, clamped to the number of bytes read. The
+            # trimmed memoryview only gets re-sliced when the clamped length
+            # changes, so polls with unchanged reports don't allocate.
             #
-            curr_data = data_odd if odd else data_even
             try:
-                if odd:
-                    n = dev_read(in_addr, data_odd, timeout=interval)
-                    report = filter_fn(mv_odd[:n])
-                    timeouts = 0
-                    if (report is None) or (report == prev_report):
-                        yield None
-                    else:
-                        prev_report = report
-                        odd = False
-                        yield report
+                n = dev_read(in_addr, data, timeout=interval)
+                timeouts = 0
+                if check_id and (data[0] != report_id):
+                    yield None
+                    continue
+                hi = n if (n < slice_hi) else slice_hi
+                if hi != report_hi:
+                    report = data[slice_lo:hi]
+                    report_hi = hi
+                if report == prev_report:
+                    yield None
                 else:
-                    n = dev_read(in_addr, data_even, timeout=interval)
-                    report = filter_fn(mv_even[:n])
-                    timeouts = 0
-                    if (report is None) or (report == prev_report):
-                        yield None
-                    else:
-                        prev_report = report
-                        odd = True
-                        yield report
+                    prev_report = prev_data[:len(report)]
+                    prev_report[:] = report
+                    yield report
             except USBTimeoutError as e:
                 # This might be okay. Timeouts happen often for some gamepads
                 # and quite a lot (no key pressed) for boot keyboards.
@@ -0,0 +1,195 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: Copyright 2025 Sam Blenny
+#
+# Display setup and gamepad visualizer graphics for the two player demo.
+#
+from board import CKP, CKN, D0P, D0N, D1P, D1N, D2P, D2N
+import displayio
+from displayio import Bitmap, Palette, TileGrid
+import framebufferio
+import gc
+from micropython import const
+import picodvi
+import supervisor
+from supervisor import ticks_ms
+from terminalio import FONT
+
+from adafruit_display_text import bitmap_label
+import adafruit_imageload
+
+from sb_gamepad import UP, DOWN, LEFT, RIGHT, START, SELECT, L, R, A, B, X, Y
+
+
+# Sprite positions for each gamepad button, as parallel x and y tables indexed
+# by bit position of the button's bitmask. Bits that don't have a sprite are
+# zeros.
+#                 dU dD dL dR St Se  .  .  L  R  .  .  B  A  Y  X
+BTN_X = bytes((   2, 2, 1, 3, 5, 4, 0, 0, 1, 8, 0, 0, 7, 8, 6, 7))
+BTN_Y = bytes((   1, 3, 2, 2, 3, 3, 0, 0, 0, 0, 0, 0, 3, 2, 2, 1))
+
+# Sprite tiles for each gamepad button, indexed by (bit_position << 1) |
+# pressed. Each button gets 2 bytes: (released_tile, pressed_tile).
+TILES = bytes((
+    12,  8,  # 0x0001 UP
+    26, 22,  # 0x0002 DOWN
+    18, 14,  # 0x0004 LEFT
+    20, 16,  # 0x0008 RIGHT
+    25, 11,  # 0x0010 START
+    24, 10,  # 0x0020 SELECT
+     0,  0,
+     0,  0,
+     5,  1,  # 0x0100 L
+     5,  1,  # 0x0200 R
+     0,  0,
+     0,  0,
+    17, 15,  # 0x1000 B
+    17, 15,  # 0x2000 A
+    17, 15,  # 0x4000 Y
+    17, 15,  # 0x8000 X
+))
+
+# Gamepad scene tilemap, 10 sprites wide by 5 sprites tall, flattened in row
+# major order
+TILEMAP = bytes((
+    0, 5, 2, 3, 3, 3, 3, 4, 5, 6,            # . L . . . . . . R .
+    7, 9, 12, 9, 9, 9, 9, 17, 9, 13,         # . . dU. . . . X . .
+    7, 18, 19, 20, 9, 9, 17, 9, 17, 13,      # . dL. dR. . Y . A .
+    7, 9, 26, 9, 24, 25, 9, 17, 9, 13,       # . . dD. SeSt. B . .
+    21, 23, 23, 23, 23, 23, 23, 23, 23, 27,  # . . . . . . . . . .
+))
+
+# Minimum time between display refreshes (about 60 Hz). USB polling can run
+# much faster than that, so refreshing any faster would just waste CPU.
+REFRESH_MS = const(16)
+
+# supervisor.ticks_ms() rolls over at 2**29, so tick differences get masked
+_TICKS_MASK = const(0x1fffffff)
+
+# Mask for all the buttons that have sprites
+_BTN_MASK = UP | DOWN | LEFT | RIGHT | START | SELECT | L | R | A | B | X | Y
+
+
+def init_display(width, height, color_depth):
+    # Initialize the picodvi display
+    # Video mode compatibility:
+    # | Video Mode     | Fruit Jam | Metro RP2350 No PSRAM    |
+    # | -------------- | --------- | ------------------------ |
+    # | (320, 240,  8) | Yes!      | Yes!                     |
+    # | (320, 240, 16) | Yes!      | Yes!                     |
+    # | (320, 240, 32) | Yes!      | MemoryError exception :( |
+    # | (640, 480,  8) | Yes!      | MemoryError exception :( |
+    displayio.release_displays()
+    gc.collect()
+    fb = picodvi.Framebuffer(width, height, clk_dp=CKP, clk_dn=CKN,
+        red_dp=D0P, red_dn=D0N, green_dp=D1P, green_dn=D1N,
+        blue_dp=D2P, blue_dn=D2N, color_depth=color_depth)
+    display = framebufferio.FramebufferDisplay(fb)
+    supervisor.runtime.display = display
+    return display
+
+
+class GamepadVisualizer:
+
+    def __init__(self, display, group):
+        # load spritesheet and palette
+        (bitmap, palette) = adafruit_imageload.load("sprites2x.bmp",
+            bitmap=Bitmap, palette=Palette)
+        # assemble TileGrid with gamepad using sprites from the spritesheet
+        scene_1 = TileGrid(bitmap, pixel_shader=palette, width=10, height=5,
+            tile_width=16, tile_height=16, default_tile=9, x=16, y=16)
+        scene_2 = TileGrid(bitmap, pixel_shader=palette, width=10, height=5,
+            tile_width=16, tile_height=16, default_tile=9, x=142, y=128)
+        # TileGrid accepts a flat index (y * width + x), so one loop over the
+        # flattened tilemap fills both scenes without building (x, y) tuples
+        tilemap = TILEMAP
+        for i in range(len(tilemap)):
+            sprite = tilemap[i]
+            scene_1[i] = sprite
+            scene_2[i] = sprite
+        group.append(scene_1)
+        group.append(scene_2)
+
+        # Make a text label for status messages
+        status_1 = bitmap_label.Label(FONT, text="", color=0xFFFFFF, scale=1)
+        status_1.anchor_point = (0, 0)
+        status_1.anchored_position = (22, 100)
+        group.append(status_1)
+
+        # Make a separate text label for input event report data
+        status_2 = bitmap_label.Label(FONT, text="", color=0xFFFFFF, scale=1)
+        status_2.anchor_point = (0, 0)
+        status_2.anchored_position = (148, 212)
+        group.append(status_2)
+
+        self.display = display
+        self.group = group
+        self.bitmap = bitmap
+        self.palette = palette
+        self.scene_1 = scene_1
+        self.scene_2 = scene_2
+        self.tilemap = tilemap
+        self.status_1 = status_1
+        self.status_2 = status_2
+        self._dirty = False
+        # Start the throttle timer one period back so the first refresh
+        # doesn't get deferred
+        self._last_refresh = (ticks_ms() - REFRESH_MS) & _TICKS_MASK
+
+
+    def refresh(self, force=False):
+        # Refresh the display if sprites or labels changed since the last
+        # refresh. The mutator methods only mark the visualizer as dirty, so
+        # callers should call this once per pass of their event loop. To cap
+        # the frame rate, refreshes closer together than REFRESH_MS get
+        # deferred until a later call.
+        # - force: skip the frame rate cap (for status changes, which only
+        #   happen on connect or disconnect and may not get another refresh
+        #   call for a while)
+        if self._dirty:
+            now = ticks_ms()
+            if not force:
+                # mask handles rollover since ticks_ms rolls over at 2**29
+                if ((now - self._last_refresh) & _TICKS_MASK) < REFRESH_MS:
+                    return
+            self._last_refresh = now
+            self._dirty = False
+            self.display.refresh()
+
+
+    def input_event(self, buttons, diff, player=1):
+        # Update TileGrid sprites to reflect changed state of gamepad buttons
+        # Scene is 10 sprites wide by 5 sprites tall:
+        #  Y
+        #  0 . L . . . . . . R .
+        #  1 . . dU. . . . X . .
+        #  2 . dL. dR. . Y . A .
+        #  3 . . dD. SeSt. B . .
+        #  4 . . . . . . . . . .
+        #    0 1 2 3 4 5 6 7 8 9 X
+        #
+        if player == 2:
+            scene = self.scene_2
+        else:
+            scene = self.scene_1
+        # Only visit the bits that changed, lowest set bit first. Masking diff
+        # skips bits without sprites (e.g. XInput Home button).
+        diff &= _BTN_MASK
+        bx = BTN_X  # caching globals as locals avoids dictionary lookups
+        by = BTN_Y
+        tiles = TILES
+        while diff:
+            b = diff & -diff  # isolate lowest set bit
+            i = b.bit_length() - 1  # bit position
+            scene[bx[i], by[i]] = tiles[(i << 1) | ((buttons >> i) & 1)]
+            diff ^= b
+        self._dirty = True
+
+
+    def set_status(self, msg, player=1):
+        # Status label updater. Skip the label rebuild and refresh if the
+        # message hasn't changed.
+        label = self.status_2 if (player == 2) else self.status_1
+        if label.text == msg:
+            return
+        label.text = msg
+        self._dirty = True